@@ -1,9 +1,19 @@
+import errno
 import os
 import re
 import shutil
+from bisect import insort
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 
+# 中文日期，如 "2024年1月12日"
+_CN_DATE_RE = re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日')
+
+# 日期整理模式中的文件夹信息，日期在首位，默认排序即按日期排序
+FolderInfo = namedtuple('FolderInfo', 'date name path')
+
 def parse_chinese_date(date_str):
     """
     解析中文日期格式，如 "2024年1月12日"
@@ -15,7 +25,7 @@ def parse_chinese_date(date_str):
     date_str = date_str.split(', ')[-1]
     
     # 使用正则表达式提取年、月、日
-    match = re.match(r'(\d{4})年(\d{1,2})月(\d{1,2})日', date_str)
+    match = _CN_DATE_RE.match(date_str)
     if match:
         year = int(match.group(1))
         month = int(match.group(2))
@@ -23,6 +33,84 @@ def parse_chinese_date(date_str):
         return datetime(year, month, day)
     return None
 
+def _iter_files(path):
+    """
+    递归遍历文件夹下的所有非目录条目，直接使用 scandir 缓存的条目信息
+
+    使用显式栈代替递归，避免目录层级过深时超出递归深度
+
+    :param path: 文件夹路径
+    :return: os.DirEntry 生成器
+    """
+    stack = [path]
+    while stack:
+        # 与 os.walk 一样跳过无法读取的子文件夹
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_dir():
+                    # 指向文件夹的符号链接，与 os.walk 一样既不进入也不当作文件
+                    continue
+                else:
+                    yield entry
+
+def _dir_size(path):
+    """
+    计算文件夹大小
+
+    :param path: 文件夹路径
+    :return: 文件总字节数
+    """
+    return sum(entry.stat(follow_symlinks=False).st_size for entry in _iter_files(path))
+
+def _move(src, dst):
+    """
+    移动文件夹，同一文件系统下直接 rename，跨设备时退回 shutil.move
+
+    :param src: 源路径
+    :param dst: 目标路径
+    """
+    # 目标已存在时保持 shutil.move 的语义（移入目标文件夹）
+    if os.path.exists(dst):
+        shutil.move(src, dst)
+        return
+
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
+def _link_or_copy(src, dst):
+    """
+    为文件创建硬链接，无法链接时（跨设备、不支持等）退回 shutil.copy2
+
+    :param src: 源文件路径
+    :param dst: 目标文件路径
+    """
+    if os.path.lexists(dst):
+        # 已是同一个文件时无需处理
+        try:
+            if os.path.samefile(src, dst):
+                return
+        except OSError:
+            pass
+        # 目标可能与其他源文件共享 inode，先删除再覆盖，绝不通过它写入
+        os.unlink(dst)
+
+    try:
+        os.link(src, dst)
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+            raise
+        shutil.copy2(src, dst)
+
 def organize_folders(base_directory, mode='date', custom_pattern=None):
     """
     文件夹整理工具，支持多种整理模式
@@ -42,30 +130,27 @@ def organize_folders(base_directory, mode='date', custom_pattern=None):
 
         # 按日期整理
         if mode == 'date':
-            # 用于存储每个月份的文件夹列表
-            month_folders = {}
+            # 用于存储每个月份的文件夹列表，列表始终按日期有序
+            month_folders = defaultdict(list)
+
+            # 第一步：收集并分类文件夹（只看基本目录的第一层，不进入子文件夹）
+            with os.scandir(base_directory) as it:
+                entries = list(it)
 
-            # 第一步：收集并分类文件夹
-            for folder_name in os.listdir(base_directory):
-                folder_path = os.path.join(base_directory, folder_name)
+            for entry in entries:
+                folder_name = entry.name
+                folder_path = entry.path
 
-                if os.path.isdir(folder_path):
+                if entry.is_dir(follow_symlinks=False):
                     try:
                         # 尝试解析中文日期
                         date_obj = parse_chinese_date(folder_name)
                         
                         if date_obj:
                             month_key = date_obj.strftime('%m')
-                            # 如果这个月份还没有对应的列表，就创建一个
-                            if month_key not in month_folders:
-                                month_folders[month_key] = []
                             
-                            # 将文件夹信息添加到对应月份的列表中
-                            month_folders[month_key].append({
-                                'name': folder_name,
-                                'path': folder_path,
-                                'date': date_obj
-                            })
+                            # 将文件夹信息按日期插入到对应月份的列表中
+                            insort(month_folders[month_key], FolderInfo(date_obj, folder_name, folder_path))
                         else:
                             logger.warning(f"无法处理文件夹 {folder_name}")
                     except Exception as e:
@@ -77,20 +162,18 @@ def organize_folders(base_directory, mode='date', custom_pattern=None):
                 month_folder_path = os.path.join(base_directory, month)
                 os.makedirs(month_folder_path, exist_ok=True)
 
-                # 按日期排序文件夹
-                sorted_folders = sorted(folders, key=lambda x: x['date'])
-
-                for folder_info in sorted_folders:
+                # 列表已按日期排序，直接遍历
+                for folder_info in folders:
                     try:
                         # 提取日期部分，确保两位数
-                        day = folder_info['date'].strftime('%d')
+                        day = folder_info.date.strftime('%d')
                         
                         # 移动文件夹到月份文件夹，并重命名为日期
                         dest_path = os.path.join(month_folder_path, day)
-                        shutil.move(folder_info['path'], dest_path)
-                        logger.info(f"移动文件夹 {folder_info['name']} 到 {month}/{day}")
+                        _move(folder_info.path, dest_path)
+                        logger.info(f"移动文件夹 {folder_info.name} 到 {month}/{day}")
                     except Exception as e:
-                        logger.warning(f"移动文件夹 {folder_info['name']} 失败: {e}")
+                        logger.warning(f"移动文件夹 {folder_info.name} 失败: {e}")
 
         # 按文件大小整理
         elif mode == 'size':
@@ -104,37 +187,47 @@ def organize_folders(base_directory, mode='date', custom_pattern=None):
                 category_path = os.path.join(base_directory, category)
                 os.makedirs(category_path, exist_ok=True)
 
-            for item in os.listdir(base_directory):
-                item_path = os.path.join(base_directory, item)
-                if os.path.isdir(item_path):
-                    total_size = sum(os.path.getsize(os.path.join(dirpath, filename)) 
-                                     for dirpath, _, filenames in os.walk(item_path) 
-                                     for filename in filenames)
-                    
-                    if total_size < size_categories['medium']:
-                        dest = os.path.join(base_directory, 'small')
-                    elif total_size < size_categories['large']:
-                        dest = os.path.join(base_directory, 'medium')
-                    else:
-                        dest = os.path.join(base_directory, 'large')
-                    
-                    shutil.move(item_path, os.path.join(dest, item))
-                    logger.info(f"移动文件夹 {item} 到 {dest}")
+            # 先收集子文件夹（跳过分类文件夹本身），避免边遍历边移动
+            with os.scandir(base_directory) as it:
+                dirs = [entry for entry in it
+                        if entry.is_dir(follow_symlinks=False) and entry.name not in size_categories]
+
+            # 计算大小是 I/O 密集型操作，用线程池并发遍历各个文件夹
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+                sizes = list(executor.map(_dir_size, [entry.path for entry in dirs]))
+
+            # 移动操作会竞争同一个目标目录，仍然串行执行
+            for entry, total_size in zip(dirs, sizes):
+                item = entry.name
+                item_path = entry.path
+
+                if total_size < size_categories['medium']:
+                    dest = os.path.join(base_directory, 'small')
+                elif total_size < size_categories['large']:
+                    dest = os.path.join(base_directory, 'medium')
+                else:
+                    dest = os.path.join(base_directory, 'large')
+
+                _move(item_path, os.path.join(dest, item))
+                logger.info(f"移动文件夹 {item} 到 {dest}")
 
         # 按文件类型整理
         elif mode == 'type':
-            for item in os.listdir(base_directory):
-                item_path = os.path.join(base_directory, item)
-                if os.path.isdir(item_path):
-                    for root, _, files in os.walk(item_path):
-                        for file in files:
-                            file_ext = os.path.splitext(file)[1][1:].lower()
-                            type_path = os.path.join(base_directory, file_ext)
-                            os.makedirs(type_path, exist_ok=True)
-                            
-                            source_file = os.path.join(root, file)
-                            dest_file = os.path.join(type_path, file)
-                            shutil.copy2(source_file, dest_file)
+            with os.scandir(base_directory) as it:
+                entries = list(it)
+
+            for entry in entries:
+                item = entry.name
+                item_path = entry.path
+                if entry.is_dir(follow_symlinks=False):
+                    for file_entry in _iter_files(item_path):
+                        file = file_entry.name
+                        file_ext = os.path.splitext(file)[1][1:].lower()
+                        type_path = os.path.join(base_directory, file_ext)
+                        os.makedirs(type_path, exist_ok=True)
+
+                        dest_file = os.path.join(type_path, file)
+                        _link_or_copy(file_entry.path, dest_file)
                     
                     logger.info(f"处理文件夹 {item} 的文件类型")
 
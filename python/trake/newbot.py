@@ -23,6 +23,7 @@ class TelegramBot:
         self.token = token
         self.application = Application.builder().token(token).build()
         self.chat_ids = set()  # 存储订阅用户的chat_id
+        self.send_semaphore = asyncio.Semaphore(30)  # 限制并发发送数，避免触发Telegram限流
         self.setup_handlers()
 
     def setup_handlers(self):
@@ -54,16 +55,22 @@ class TelegramBot:
         await update.message.reply_text("已取消订阅。")
 
     async def send_message(self, message: str):
-        """向所有订阅用户发送消息"""
-        for chat_id in self.chat_ids:
-            try:
+        """向所有订阅用户并发发送消息"""
+        async def send(chat_id):
+            async with self.send_semaphore:
                 await self.application.bot.send_message(
                     chat_id=chat_id,
                     text=message,
                     parse_mode='HTML'
                 )
-            except Exception as e:
-                logging.error(f"发送消息失败: {str(e)}")
+
+        results = await asyncio.gather(
+            *(send(chat_id) for chat_id in list(self.chat_ids)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error(f"发送消息失败: {str(result)}")
 
     def run(self):
         """运行机器人"""
@@ -72,55 +79,50 @@ class TelegramBot:
 class CompetitionBot:
     def __init__(self, tg_token: str):
         self.db_path = 'competitions.db'
+        # 复用同一个连接，WAL 模式下提交无需每次完整 fsync
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;")
         self.init_database()
+        # 已保存的比赛ID，重复的比赛无需再抓取页面和识别图片
+        self.seen_ids = {row[0] for row in self.conn.execute("SELECT id FROM competitions")}
         self.ad_spider = AdCompetitionSpider()
         self.tg_bot = TelegramBot(tg_token)
         
     def init_database(self):
         """初始化数据库"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS competitions
-            (id TEXT PRIMARY KEY,
-             title TEXT,
-             url TEXT,
-             date_info TEXT,
-             requirements TEXT,
-             organizer TEXT,
-             undertaker TEXT,
-             platform TEXT,
-             created_at TIMESTAMP)
-        ''')
-        conn.commit()
-        conn.close()
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS competitions
+                (id TEXT PRIMARY KEY,
+                 title TEXT,
+                 url TEXT,
+                 date_info TEXT,
+                 requirements TEXT,
+                 organizer TEXT,
+                 undertaker TEXT,
+                 platform TEXT,
+                 created_at TIMESTAMP)
+            ''')
 
     def save_competition(self, competition):
-        """保存比赛信息到数据库"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        try:
-            c.execute('''
-                INSERT INTO competitions 
-                (id, title, url, date_info, requirements, organizer, undertaker, platform, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                str(competition['index']),  # 使用新闻索引作为ID
-                competition['title'],
-                competition['url'],
-                competition.get('date_info', ''),
-                competition.get('requirements', ''),
-                competition.get('organizer', ''),
-                competition.get('undertaker', ''),
-                '大广赛',
-                datetime.now()
-            ))
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
-        finally:
-            conn.close()
+        """保存比赛信息到数据库（由调用方负责提交事务）"""
+        # 已存在的比赛直接忽略，通过影响行数判断是否为新比赛
+        c = self.conn.execute('''
+            INSERT OR IGNORE INTO competitions 
+            (id, title, url, date_info, requirements, organizer, undertaker, platform, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            str(competition['index']),  # 使用新闻索引作为ID
+            competition['title'],
+            competition['url'],
+            competition.get('date_info', ''),
+            competition.get('requirements', ''),
+            competition.get('organizer', ''),
+            competition.get('undertaker', ''),
+            '大广赛',
+            datetime.now()
+        ))
+        return c.rowcount == 1
 
     async def push_message(self, competition):
         """推送比赛信息到Telegram"""
@@ -138,12 +140,20 @@ class CompetitionBot:
 
     async def run_task(self):
         """执行定时任务"""
-        news_urls = self.ad_spider.fetch_news_urls()
+        # 爬虫是阻塞的网络/OCR操作，放到线程中执行以免阻塞事件循环
+        news_urls = await asyncio.to_thread(self.ad_spider.fetch_news_urls, self.seen_ids)
         competition_news = [news for news in news_urls if news['is_competition']]
         
-        for competition in competition_news:
-            if 'content' in competition and self.save_competition(competition):  # 如果是新比赛且有详细内容
-                await self.push_message(competition)
+        # 在同一个事务中写入本轮所有比赛，只提交一次
+        with self.conn:
+            new_competitions = [
+                competition for competition in competition_news
+                if 'content' in competition and self.save_competition(competition)  # 如果是新比赛且有详细内容
+            ]
+        self.seen_ids.update(str(competition['index']) for competition in new_competitions)
+
+        for competition in new_competitions:
+            await self.push_message(competition)
 
 async def main():
     # 替换为您的Telegram Bot Token
@@ -157,11 +167,17 @@ async def main():
             await bot.run_task()
             await asyncio.sleep(12 * 3600)  # 12小时
     
-    # 运行Telegram机器人和定时任务
-    await asyncio.gather(
-        bot.tg_bot.application.run_polling(),
-        scheduled_task()
-    )
+    # run_polling 会自行管理事件循环，这里手动启动机器人，使轮询与定时任务共用同一个事件循环
+    application = bot.tg_bot.application
+    await application.initialize()
+    await application.start()
+    await application.updater.start_polling()
+    try:
+        await scheduled_task()
+    finally:
+        await application.updater.stop()
+        await application.stop()
+        await application.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
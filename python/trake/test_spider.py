@@ -1,144 +1,306 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+import lxml.html
 import re
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from datetime import datetime
 from paddleocr import PaddleOCR
+import paddle
 import os
+import cv2
+import numpy
 from PIL import Image
 from io import BytesIO
-import numpy
+
+try:
+    import re2
+except ImportError:  # 未安装 google-re2 时退回逐个正则匹配
+    re2 = None
+
+try:
+    import ahocorasick
+except ImportError:  # 未安装 pyahocorasick 时退回逐个关键词查找
+    ahocorasick = None
+
+# 并发抓取页面/图片的线程数
+_FETCH_WORKERS = 8
+
+# Python 的 \s、\d 按 Unicode 匹配，RE2 只匹配 ASCII；展开为两个引擎含义相同的显式字符集
+_CLASS_CHARS = {
+    's': "\\t\\n\\v\\f\\r\\x1c-\\x1f \\x85\\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000",
+    'd': "0-9０-９",
+}
+
+def _compile(pattern: str) -> "re.Pattern":
+    """编译匹配模式，其中的 \\s、\\d 先展开为显式字符集"""
+    parts = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            escaped = pattern[i + 1]
+            if escaped in _CLASS_CHARS:
+                chars = _CLASS_CHARS[escaped]
+                parts.append(chars if in_class else f"[{chars}]")
+            else:
+                parts.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        parts.append(c)
+        i += 1
+    return re.compile("".join(parts))
+
+# 日期匹配模式
+_DATE_PATTERNS = tuple(_compile(p) for p in (
+    r"报名日期[：:]\s*([\d年月日\s至]+)",
+    r"报名时间[：:]\s*([\d年月日\s至]+)",
+    r"(\d{4}年\d{1,2}月\d{1,2}日)[至到]\s*(\d{4}年\d{1,2}月\d{1,2}日)",
+    r"(\d{4}\.\d{1,2}\.\d{1,2})[至到]\s*(\d{4}\.\d{1,2}\.\d{1,2})",
+    r"(\d{4}年\d{1,2}月\d{1,2}日)\s*[起至到]\s*(\d{4}年\d{1,2}月\d{1,2}日)\s*[结束]?",
+    r"(\d{4}\.\d{1,2}\.\d{1,2})\s*[起至到]\s*(\d{4}\.\d{1,2}\.\d{1,2})\s*[结束]?"
+))
+
+# 参赛要求匹配模式
+_REQ_PATTERNS = tuple(_compile(p) for p in (
+    r"参赛对象[：:]\s*([^。\n]+)",
+    r"参赛资格[：:]\s*([^。\n]+)",
+    r"参赛人员[：:]\s*([^。\n]+)",
+    r"参赛范围[：:]\s*([^。\n]+)"
+))
+
+# 主办方匹配模式
+_ORG_PATTERNS = tuple(_compile(p) for p in (
+    r"主办[：:]\s*([^。\n]+)",
+    r"主办单位[：:]\s*([^。\n]+)",
+    r"主办方[：:]\s*([^。\n]+)"
+))
+
+# 承办方匹配模式
+_UND_PATTERNS = tuple(_compile(p) for p in (
+    r"承办[：:]\s*([^。\n]+)",
+    r"承办单位[：:]\s*([^。\n]+)",
+    r"承办方[：:]\s*([^。\n]+)"
+))
+
+# 字段名 -> 匹配模式（按优先级排列）
+_FIELD_PATTERNS = (
+    ('date_info', _DATE_PATTERNS),
+    ('requirements', _REQ_PATTERNS),
+    ('organizer', _ORG_PATTERNS),
+    ('undertaker', _UND_PATTERNS),
+)
+
+def _build_pattern_set():
+    """将所有字段的模式编译进同一个 RE2 集合，一次扫描即可得到命中的模式编号"""
+    if re2 is None:
+        return None, ()
+    pattern_set = re2.Set.SearchSet(re2.Options())
+    owners = []
+    for field, patterns in _FIELD_PATTERNS:
+        for pat in patterns:
+            pattern_set.Add(pat.pattern)
+            owners.append((field, pat))
+    pattern_set.Compile()
+    return pattern_set, tuple(owners)
+
+_PATTERN_SET, _PATTERN_OWNERS = _build_pattern_set()
+
+def match_fields(text: str) -> Dict[str, "re.Match"]:
+    """返回每个字段优先级最高的匹配结果"""
+    matches = {}
+    if _PATTERN_SET is not None:
+        # 编号按优先级递增，每个字段取第一个命中的模式，再单独匹配一次以获取分组
+        for pattern_id in sorted(_PATTERN_SET.Match(text) or ()):
+            field, pat = _PATTERN_OWNERS[pattern_id]
+            if field not in matches:
+                matches[field] = pat.search(text)
+        return matches
+
+    for field, patterns in _FIELD_PATTERNS:
+        for pat in patterns:
+            m = pat.search(text)
+            if m:
+                matches[field] = m
+                break
+    return matches
+
+# 比赛相关新闻的标题关键词
+_COMPETITION_KEYWORDS = ("大广赛", "征集", "参赛", "比赛", "竞赛", "作品")
+
+def _build_keyword_automaton():
+    """将所有关键词构建为 Aho-Corasick 自动机，一次扫描标题即可完成匹配"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in _COMPETITION_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+def is_competition_title(title: str) -> bool:
+    """标题中是否包含比赛相关关键词"""
+    if _KEYWORD_AUTOMATON is not None:
+        return next(_KEYWORD_AUTOMATON.iter(title), None) is not None
+    return any(keyword in title for keyword in _COMPETITION_KEYWORDS)
+
+def _element_text(element) -> str:
+    """拼接元素内的文字并去除空白，与 BeautifulSoup 的 get_text(strip=True) 一致"""
+    return "".join(text.strip() for text in element.xpath(".//text()"))
+
+def _ocr_options() -> Dict:
+    """
+    OCR 模型参数：没有可用 GPU 时开启 MKL-DNN，并按 CPU 核数设置推理线程数
+    
+    可通过环境变量 OCR_DET_MODEL_DIR / OCR_REC_MODEL_DIR / OCR_CLS_MODEL_DIR 指定量化（INT8）模型目录
+    """
+    options = {'use_angle_cls': True, 'lang': "ch"}
+    if not (paddle.device.is_compiled_with_cuda() and paddle.device.cuda.device_count() > 0):
+        options.update(use_gpu=False, enable_mkldnn=True, cpu_threads=os.cpu_count() or 1)
+
+    for key in ('det_model_dir', 'rec_model_dir', 'cls_model_dir'):
+        model_dir = os.environ.get(f"OCR_{key.upper()}")
+        if model_dir:
+            options[key] = model_dir
+    return options
 
 class AdCompetitionSpider:
     """大广赛爬虫类"""
+    # OCR 模型在所有实例间共享，首次使用时才加载；模型不是线程安全的，识别时需要加锁
+    _ocr = None
+    _ocr_lock = threading.RLock()
+
     def __init__(self):
         self.base_url = "https://www.sun-ada.net"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        # 初始化 OCR
-        self.ocr = PaddleOCR(use_angle_cls=True, lang="ch")
+        # 复用连接（keep-alive），避免每次请求重新建立 TCP/TLS 连接
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=3)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @property
+    def ocr(self) -> PaddleOCR:
+        """共享的 OCR 模型"""
+        with self._ocr_lock:
+            if AdCompetitionSpider._ocr is None:
+                AdCompetitionSpider._ocr = PaddleOCR(**_ocr_options())
+            return AdCompetitionSpider._ocr
 
-    def get_text_from_image(self, image_url: str) -> str:
-        """从图片中提取文字"""
+    def fetch_image(self, image_url: str) -> Optional[bytes]:
+        """下载图片，失败时返回 None"""
         try:
-            print(f"正在处理图片: {image_url}")
-            # 下载图片
-            response = requests.get(image_url, headers=self.headers)
+            print(f"正在下载图片: {image_url}")
+            response = self.session.get(image_url, timeout=10)
             if response.status_code != 200:
                 print(f"下载图片失败: {response.status_code}")
-                return ""
+                return None
+            return response.content
 
-            # 将图片内容转换为PIL Image对象
-            image = Image.open(BytesIO(response.content))
-            
-            # 使用OCR识别文字
-            result = self.ocr.ocr(numpy.array(image), cls=True)
-            
-            # 提取所有识别出的文字
-            text_list = []
-            if result:
-                for line in result:
-                    for word_info in line:
+        except Exception as e:
+            print(f"图片下载失败: {str(e)}")
+            return None
+
+    def iter_text_from_images(self, images: List[bytes]) -> Iterator[str]:
+        """依次识别图片，逐张返回其中的文字"""
+        # 先在锁外解码所有图片，直接解码为 OpenCV 的 BGR 数组
+        arrays = []
+        for image_content in images:
+            array = cv2.imdecode(numpy.frombuffer(image_content, numpy.uint8), cv2.IMREAD_COLOR)
+            if array is None:
+                # OpenCV 无法解码的格式（如 GIF）退回 PIL，再转换为 BGR
+                try:
+                    image = Image.open(BytesIO(image_content)).convert('RGB')
+                    array = cv2.cvtColor(numpy.array(image), cv2.COLOR_RGB2BGR)
+                except Exception as e:
+                    print(f"图片解码失败: {str(e)}")
+                    continue
+            arrays.append(array)
+
+        # 一次持有模型完成整页图片的识别，调用方可随时停止迭代以跳过剩余图片
+        with self._ocr_lock:
+            ocr = self.ocr
+            for array in arrays:
+                try:
+                    result = ocr.ocr(array, cls=True)
+                except Exception as e:
+                    print(f"图片处理失败: {str(e)}")
+                    continue
+
+                # 提取所有识别出的文字
+                text_list = []
+                for line in result or []:
+                    for word_info in line or []:
                         text_list.append(word_info[1][0])  # 提取识别出的文字
-            
-            # 合并所有文字
-            full_text = "\n".join(text_list)
-            print(f"识别出的文字:\n{full_text[:200]}...")  # 打印前200个字符
-            
-            return full_text
 
-        except Exception as e:
-            print(f"图片处理失败: {str(e)}")
-            return ""
+                # 合并所有文字
+                full_text = "\n".join(text_list)
+                print(f"识别出的文字:\n{full_text[:200]}...")  # 打印前200个字符
+
+                yield full_text
 
     def parse_news_content(self, url: str) -> Dict:
         """解析新闻内容（包括图片中的文字）"""
         try:
             print(f"正在解析页面: {url}")
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url, timeout=10)
             response.encoding = 'utf-8'
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'lxml')
             
-            # 查找图片
-            img_tags = soup.find_all('img')
-            content_text = ""
-            
-            for img in img_tags:
-                img_url = img.get('src', '')
-                if img_url:
-                    if not img_url.startswith('http'):
-                        img_url = f"{self.base_url}/{img_url.lstrip('/')}"
-                    
-                    # 获取图片中的文字
-                    img_text = self.get_text_from_image(img_url)
-                    if img_text:
-                        content_text += f"\n{img_text}"
-            
-            # 日期匹配模式
-            date_patterns = [
-                r"报名日期[：:]\s*([\d年月日\s至]+)",
-                r"报名时间[：:]\s*([\d年月日\s至]+)",
-                r"(\d{4}年\d{1,2}月\d{1,2}日)[至到]\s*(\d{4}年\d{1,2}月\d{1,2}日)",
-                r"(\d{4}\.\d{1,2}\.\d{1,2})[至到]\s*(\d{4}\.\d{1,2}\.\d{1,2})",
-                r"(\d{4}年\d{1,2}月\d{1,2}日)\s*[起至到]\s*(\d{4}年\d{1,2}月\d{1,2}日)\s*[结束]?",
-                r"(\d{4}\.\d{1,2}\.\d{1,2})\s*[起至到]\s*(\d{4}\.\d{1,2}\.\d{1,2})\s*[结束]?"
-            ]
-            
-            # 参赛要求匹配模式
-            requirements_patterns = [
-                r"参赛对象[：:]\s*([^。\n]+)",
-                r"参赛资格[：:]\s*([^。\n]+)",
-                r"参赛人员[：:]\s*([^。\n]+)",
-                r"参赛范围[：:]\s*([^。\n]+)"
-            ]
-            
-            # 主办方匹配模式
-            organizer_patterns = [
-                r"主办[：:]\s*([^。\n]+)",
-                r"主办单位[：:]\s*([^。\n]+)",
-                r"主办方[：:]\s*([^。\n]+)"
-            ]
-            
-            # 承办方匹配模式
-            undertaker_patterns = [
-                r"承办[：:]\s*([^。\n]+)",
-                r"承办单位[：:]\s*([^。\n]+)",
-                r"承办方[：:]\s*([^。\n]+)"
-            ]
-            
-            # 尝试匹配日期
+            # 先匹配页面正文，字段齐全时无需再识别图片
+            content_text = soup.get_text('\n', strip=True)
+            matches = match_fields(content_text)
+
+            if len(matches) < len(_FIELD_PATTERNS):
+                # 查找图片
+                img_urls = []
+                for img in soup.find_all('img'):
+                    img_url = img.get('src', '')
+                    if img_url:
+                        if not img_url.startswith('http'):
+                            img_url = f"{self.base_url}/{img_url.lstrip('/')}"
+                        img_urls.append(img_url)
+
+                # 并发下载所有图片，再依次识别
+                with ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as executor:
+                    images = [image for image in executor.map(self.fetch_image, img_urls) if image]
+
+                # 获取图片中的文字，closing 确保提前结束时释放模型锁
+                with closing(self.iter_text_from_images(images)) as img_texts:
+                    for img_text in img_texts:
+                        if img_text:
+                            content_text += f"\n{img_text}"
+                            matches = match_fields(content_text)
+                            # 所有字段都已找到时不再识别剩余图片
+                            if len(matches) == len(_FIELD_PATTERNS):
+                                break
+
+            # 日期可能是单个字段或起止两个日期
             date_info = None
-            for pattern in date_patterns:
-                match = re.search(pattern, content_text)
-                if match:
-                    if len(match.groups()) == 1:
-                        date_info = match.group(1)
-                    elif len(match.groups()) == 2:
-                        date_info = f"{match.group(1)}至{match.group(2)}"
-                    break
-            
-            # 尝试匹配其他信息
-            requirements = None
-            for pattern in requirements_patterns:
-                match = re.search(pattern, content_text)
-                if match:
-                    requirements = match.group(1)
-                    break
-                    
-            organizer = None
-            for pattern in organizer_patterns:
-                match = re.search(pattern, content_text)
-                if match:
-                    organizer = match.group(1)
-                    break
-                    
-            undertaker = None
-            for pattern in undertaker_patterns:
-                match = re.search(pattern, content_text)
-                if match:
-                    undertaker = match.group(1)
-                    break
+            m = matches.get('date_info')
+            if m:
+                if len(m.groups()) == 1:
+                    date_info = m.group(1)
+                elif len(m.groups()) == 2:
+                    date_info = f"{m.group(1)}至{m.group(2)}"
+
+            # 其他信息
+            requirements = matches['requirements'].group(1) if 'requirements' in matches else None
+            organizer = matches['organizer'].group(1) if 'organizer' in matches else None
+            undertaker = matches['undertaker'].group(1) if 'undertaker' in matches else None
 
             return {
                 'content': content_text,
@@ -151,37 +313,40 @@ class AdCompetitionSpider:
             print(f"解析页面失败: {str(e)}")
             return None
 
-    def fetch_news_urls(self) -> List[Dict]:
-        """爬取所有新闻链接"""
+    def fetch_news_urls(self, seen_ids: Optional[set] = None) -> List[Dict]:
+        """
+        爬取所有新闻链接
+        
+        :param seen_ids: 已保存过的新闻ID（即 str(index)），这些比赛不再解析内容
+        """
+        seen_ids = seen_ids or set()
         try:
             print(f"开始访问新闻页: {self.base_url}/home/newss.html")
-            response = requests.get(f"{self.base_url}/home/newss.html", headers=self.headers)
-            response.encoding = 'utf-8'
+            response = self.session.get(f"{self.base_url}/home/newss.html", timeout=10)
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            news_list = soup.find('ul', class_='list_news')
+            # 传入字节并指定编码，带 XML 编码声明的页面传入 str 会报错
+            doc = lxml.html.fromstring(response.content, parser=lxml.html.HTMLParser(encoding='utf-8'))
+            news_list = doc.xpath("//ul[contains(concat(' ', normalize-space(@class), ' '), ' list_news ')]")
             if not news_list:
                 print("未找到新闻列表")
                 return []
                 
-            news_items = news_list.find_all('li')
+            news_items = news_list[0].xpath(".//li")
             print(f"\n找到 {len(news_items)} 条新闻")
             
             news_urls = []
-            competition_keywords = ["大广赛", "征集", "参赛", "比赛", "竞赛", "作品"]
-            
             for index, item in enumerate(news_items, 1):
-                link = item.find('a')
-                if not link:
+                link = next(iter(item.xpath(".//a")), None)
+                if link is None:
                     continue
                 
-                title_elem = link.find('h3')
-                if not title_elem:
+                title_elem = next(iter(link.xpath(".//h3")), None)
+                if title_elem is None:
                     continue
                     
-                title = title_elem.get_text(strip=True)
-                date_elem = link.find('em')
-                date = date_elem.get_text(strip=True) if date_elem else ""
+                title = _element_text(title_elem)
+                date_elem = next(iter(link.xpath(".//em")), None)
+                date = _element_text(date_elem) if date_elem is not None else ""
                 
                 href = link.get('href', '')
                 if href.startswith('http'):
@@ -191,43 +356,28 @@ class AdCompetitionSpider:
                 else:
                     url = f"{self.base_url}/{href}"
                 
-                is_competition = any(keyword in title for keyword in competition_keywords)
-                
-                if is_competition:
-                    # 解析新闻内容（包括图片中的文字）
-                    content_info = self.parse_news_content(url)
-                    if content_info:
-                        news_info = {
-                            'index': index,
-                            'title': title,
-                            'date': date,
-                            'url': url,
-                            'is_competition': True,
-                            'content': content_info['content'],
-                            'date_info': content_info['date_info'],
-                            'requirements': content_info['requirements'],
-                            'organizer': content_info['organizer'],
-                            'undertaker': content_info['undertaker']
-                        }
-                    else:
-                        news_info = {
-                            'index': index,
-                            'title': title,
-                            'date': date,
-                            'url': url,
-                            'is_competition': True
-                        }
-                else:
-                    news_info = {
-                        'index': index,
-                        'title': title,
-                        'date': date,
-                        'url': url,
-                        'is_competition': False
-                    }
+                is_competition = is_competition_title(title)
                 
+                news_info = {
+                    'index': index,
+                    'title': title,
+                    'date': date,
+                    'url': url,
+                    'is_competition': is_competition
+                }
                 news_urls.append(news_info)
             
+            # 并发解析比赛新闻内容（包括图片中的文字）
+            competition_news = [
+                news for news in news_urls
+                if news['is_competition'] and str(news['index']) not in seen_ids
+            ]
+            with ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as executor:
+                content_infos = executor.map(self.parse_news_content, [news['url'] for news in competition_news])
+                for news_info, content_info in zip(competition_news, content_infos):
+                    if content_info:
+                        news_info.update(content_info)
+            
             return news_urls
             
         except Exception as e: